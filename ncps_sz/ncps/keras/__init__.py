@@ -16,6 +16,8 @@
 from __future__ import absolute_import
 
 from .ltc_cell import LTCCell
+from .ltc_cell_numba import LTCCellNumba
+from .batched_ltc_cell import BatchedLTCCell
 from .mm_rnn import MixedMemoryRNN
 from .cfc_cell import CfCCell
 from .wired_cfc_cell import WiredCfCCell
@@ -41,4 +43,4 @@ if parse(keras.__version__) < parse("3.0.0"):
         "You can use `pip freeze` to check afterwards that everything is "
         "ok.".format(version=keras.__version__)
     )
-__all__ = ["CfC", "CfCCell", "LTC", "LTCCell", "MixedMemoryRNN", "WiredCfCCell"]
+__all__ = ["CfC", "CfCCell", "LTC", "LTCCell", "LTCCellNumba", "BatchedLTCCell", "MixedMemoryRNN", "WiredCfCCell"]
@@ -0,0 +1,109 @@
+# Copyright 2022 Mathias Lechner and Ramin Hasani
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numba
+import numpy as np
+
+
+# Number of batch rows processed together. The parameters of a synapse are
+# loaded once per tile and the (units, tile) state tile stays cache resident
+BATCH_TILE = 16
+
+
+@numba.njit(fastmath=True, cache=True)
+def _accumulate_currents(v, mu, sigma, w, erev, src_idx, indptr, numerator, denominator):
+    # Synapses are sorted by their postsynaptic neuron n, i.e., its incoming
+    # synapses are the contiguous range indptr[n]:indptr[n + 1]
+    tile_size = v.shape[1]
+    for n in range(indptr.shape[0] - 1):
+        for e in range(indptr[n], indptr[n + 1]):
+            src = src_idx[e]
+            for b in range(tile_size):
+                x = sigma[e] * (v[src, b] - mu[e])
+                activation = w[e] * (0.5 + 0.5 * np.tanh(0.5 * x))
+                numerator[n, b] += activation * erev[e]
+                denominator[n, b] += activation
+
+
+@numba.njit(fastmath=True, cache=True)
+def ode_solver(
+        v_pre,
+        inputs,
+        cm_t,
+        gleak,
+        vleak,
+        mu,
+        sigma,
+        w,
+        erev,
+        src_idx,
+        indptr,
+        sensory_mu,
+        sensory_sigma,
+        sensory_w,
+        sensory_erev,
+        sensory_src_idx,
+        sensory_indptr,
+        ode_unfolds,
+        epsilon,
+):
+    """Solves the LTC ODE of one RNN step on the synapse edge lists.
+
+    :param v_pre: Neuron state of shape (batch, units)
+    :param inputs: Mapped inputs of shape (batch, sensory units)
+    :param cm_t: Membrane capacitance divided by the unfold step size, of shape (batch, units)
+    :param indptr: Offsets of the incoming synapses of each neuron, of shape (units + 1,)
+    :param sensory_indptr: Offsets of the incoming sensory synapses of each neuron, of shape (units + 1,)
+    :return: Next neuron state of shape (batch, units)
+    """
+    batch_size = v_pre.shape[0]
+    v_next = np.empty_like(v_pre)
+    for start in range(0, batch_size, BATCH_TILE):
+        end = min(start + BATCH_TILE, batch_size)
+        # Tiles are neuron-major, such that the innermost loop over the batch
+        # rows reads and writes contiguous memory
+        v = np.ascontiguousarray(v_pre[start:end].T)
+        cm_t_tile = np.ascontiguousarray(cm_t[start:end].T)
+
+        # The leak and sensory terms are loop invariant
+        numerator_invariant = np.zeros_like(v)
+        denominator_invariant = np.zeros_like(v)
+        _accumulate_currents(
+            np.ascontiguousarray(inputs[start:end].T),
+            sensory_mu,
+            sensory_sigma,
+            sensory_w,
+            sensory_erev,
+            sensory_src_idx,
+            sensory_indptr,
+            numerator_invariant,
+            denominator_invariant,
+        )
+        for n in range(v.shape[0]):
+            numerator_invariant[n] += gleak[n] * vleak[n]
+            denominator_invariant[n] += cm_t_tile[n] + gleak[n] + epsilon
+
+        w_numerator = np.empty_like(v)
+        w_denominator = np.empty_like(v)
+        for t in range(ode_unfolds):
+            w_numerator[:] = 0.0
+            w_denominator[:] = 0.0
+            _accumulate_currents(
+                v, mu, sigma, w, erev, src_idx, indptr, w_numerator, w_denominator
+            )
+            v = (cm_t_tile * v + numerator_invariant + w_numerator) / (
+                    denominator_invariant + w_denominator
+            )
+        v_next[start:end] = v.T
+    return v_next
@@ -0,0 +1,115 @@
+# Copyright 2022 Mathias Lechner and Ramin Hasani
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import keras
+import numpy as np
+
+from .ltc_cell import LTCCell
+
+
+@keras.utils.register_keras_serializable(package="ncps", name="BatchedLTCCell")
+class BatchedLTCCell(LTCCell):
+    name = "Batched-LTC-Cell"
+
+    def __init__(self, wiring, num_cells, **kwargs):
+        """A stack of `num_cells` independent `Liquid time-constant (LTC) <https://ojs.aaai.org/index.php/AAAI/article/view/16936>`_ cells
+        with identical wiring, which are simulated as one block-diagonal cell.
+
+        Small LTC cells cannot occupy an accelerator on their own. When many independent sequences
+        are processed, e.g., by the agents of a control or reinforcement learning setup, this cell
+        solves the ODEs of all cells with the same kernels. Each cell has its own weights.
+
+        The features and outputs of the cells are concatenated along the last axis, i.e., the k-th
+        cell reads the features ``[k * input_dim, (k + 1) * input_dim)`` of the inputs and writes the
+        outputs ``[k * output_dim, (k + 1) * output_dim)``. The state is not a concatenation of the
+        states of the cells: it holds the motor neurons of all cells first, followed by the remaining
+        neurons of each cell. Use `state_indices` to locate the neurons of a cell within the state,
+        e.g., to build an initial state or to slice the final state per cell.
+
+        Examples::
+
+             >>> import ncps
+             >>> from ncps.keras import BatchedLTCCell
+             >>>
+             >>> wiring = ncps.wirings.Random(16, output_dim=2, sparsity_level=0.5)
+             >>> rnn = keras.layers.RNN(BatchedLTCCell(wiring, num_cells=8), return_sequences=True)
+             >>> x_seq = keras.random.uniform((1,20,8*4)) # (batch, time, cells*features)
+             >>> y_seq = rnn(x_seq) # (batch, time, cells*outputs)
+             >>> idx = rnn.cell.state_indices(3) # Neurons of the 4th cell within the state
+
+        :param wiring:
+        :param num_cells: Number of independent cells
+        :param kwargs: See `ncps.keras.LTCCell`
+        """
+        super().__init__(wiring, **kwargs)
+        self._num_cells = num_cells
+
+    @property
+    def state_size(self):
+        return self._num_cells * self.wiring.units
+
+    @property
+    def sensory_size(self):
+        return self._num_cells * self.wiring.input_dim
+
+    @property
+    def motor_size(self):
+        return self._num_cells * self.wiring.output_dim
+
+    def state_indices(self, cell):
+        """Returns the positions of the neurons of a cell within the state of the stacked cells.
+
+        :param cell: Index of the cell
+        :return: Array of shape (units,) whose n-th entry is the state index of neuron n of the cell
+        """
+        return self._neuron_index(np.arange(self.wiring.units), cell)
+
+    def _build_wiring(self, input_dim):
+        if input_dim % self._num_cells != 0:
+            raise ValueError(
+                "Input dimension {} is not divisible by the number of cells {}".format(
+                    input_dim, self._num_cells
+                )
+            )
+        self.wiring.build(input_dim // self._num_cells)
+
+    def _neuron_index(self, neuron, cell):
+        # The motor neurons of all cells come first, such that the outputs
+        # are read from the leading neurons as for a single cell
+        units, motor_size = self.wiring.units, self.wiring.output_dim
+        return np.where(
+            neuron < motor_size,
+            cell * motor_size + neuron,
+            self._num_cells * motor_size + cell * (units - motor_size) + neuron - motor_size,
+        )
+
+    def _synapse_edges(self, adjacency_matrix, erev, sensory=False):
+        src_idx, dst_idx, erev = super()._synapse_edges(adjacency_matrix, erev, sensory)
+        cells = np.repeat(np.arange(self._num_cells), len(src_idx))
+        src_idx = np.tile(src_idx, self._num_cells)
+        dst_idx = np.tile(dst_idx, self._num_cells)
+        if sensory:
+            src_idx = cells * self.wiring.input_dim + src_idx
+        else:
+            src_idx = self._neuron_index(src_idx, cells)
+        dst_idx = self._neuron_index(dst_idx, cells)
+
+        # Keep the synapses sorted by their postsynaptic neuron
+        order = np.argsort(dst_idx, kind="stable")
+        return src_idx[order], dst_idx[order], np.tile(erev, self._num_cells)[order]
+
+    def get_config(self):
+        config = super(BatchedLTCCell, self).get_config()
+        config["num_cells"] = self._num_cells
+        return config
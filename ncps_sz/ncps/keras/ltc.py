@@ -30,6 +30,7 @@ class LTC(keras.layers.RNN):
             ode_unfolds=6,
             epsilon=1e-8,
             initialization_ranges=None,
+            synapse_dtype="float32",
             return_sequences: bool = False,
             return_state: bool = False,
             go_backwards: bool = False,
@@ -68,6 +69,7 @@ class LTC(keras.layers.RNN):
         :param ode_unfolds: Number of ODE-solver steps per time-step (default 6)
         :param epsilon: Auxillary value to avoid dividing by 0 (default 1e-8)
         :param initialization_ranges: A dictionary for overwriting the range of the uniform weight initialization (default None)
+        :param synapse_dtype: Storage dtype of the synaptic parameters, e.g., "bfloat16" to halve their memory traffic. The neuron state is always accumulated in float32 (default "float32")
         :param return_sequences: Whether to return the full sequence or just the last output (default False)
         :param return_state: Whether to return just the output of the RNN or a tuple (output, last_hidden_state) (default False)
         :param go_backwards: If True, the input sequence will be process from back to the front (default False)
@@ -93,6 +95,7 @@ class LTC(keras.layers.RNN):
             ode_unfolds=ode_unfolds,
             epsilon=epsilon,
             initialization_ranges=initialization_ranges,
+            synapse_dtype=synapse_dtype,
             **kwargs,
         )
         if mixed_memory:
@@ -108,6 +111,20 @@ class LTC(keras.layers.RNN):
             **kwargs,
         )
 
+    def inner_loop(self, sequences, initial_state, mask, training=False):
+        # Regularly sampled sequences are processed by the cell in a single scan,
+        # instead of invoking the cell as a layer for every time-step
+        if (
+                isinstance(self.cell, LTCCell)
+                and not isinstance(sequences, (list, tuple))
+                and mask is None
+                and not self.go_backwards
+                and not self.unroll
+        ):
+            outputs, final_state = self.cell.call_sequence(sequences, initial_state[0])
+            return outputs[:, -1], outputs, [final_state]
+        return super(LTC, self).inner_loop(sequences, initial_state, mask, training)
+
     def get_config(self):
         is_mixed_memory = isinstance(self.cell, MixedMemoryRNN)
         cell: LTCCell = self.cell.rnn_cell if is_mixed_memory else self.cell
@@ -16,6 +16,142 @@ import keras
 import numpy as np
 
 
+def _jit_compile(fn):
+    """Compiles ``fn`` into a single fused XLA kernel on the TensorFlow backend.
+
+    The JAX backend already traces the whole layer with ``jax.jit`` and the
+    PyTorch backend has no equivalent, hence ``fn`` is returned unchanged there.
+    """
+    if keras.backend.backend() == "tensorflow":
+        import tensorflow as tf
+
+        return tf.function(fn, jit_compile=True, reduce_retracing=True)
+    return fn
+
+
+def _synapses(adjacency_matrix):
+    """Returns the (presynaptic, postsynaptic) neuron indices of all synapses.
+
+    Synapses are sorted by their postsynaptic neuron, such that the reduction
+    over the incoming synapses of a neuron scans a contiguous range of edges.
+    """
+    src_idx, dst_idx = np.nonzero(adjacency_matrix)
+    order = np.argsort(dst_idx, kind="stable")
+    return src_idx[order], dst_idx[order]
+
+
+def _segment_sum(data, segment_ids, num_segments):
+    # TensorFlow has no XLA kernel for the sorted segment sum, hence the sorted
+    # hint is only passed on to JAX
+    return keras.ops.segment_sum(
+        data,
+        segment_ids,
+        num_segments=num_segments,
+        sorted=keras.backend.backend() == "jax",
+    )
+
+
+def _fori_loop(lower, upper, body_fun, init_val):
+    if keras.backend.backend() == "tensorflow":
+        # Gradients of a tf.while_loop cannot cross the boundary of the XLA
+        # compiled function, hence the loop is unrolled into straight-line code
+        val = init_val
+        for i in range(lower, upper):
+            val = body_fun(i, val)
+        return val
+    return keras.ops.fori_loop(lower, upper, body_fun, init_val)
+
+
+def _sigmoid(x):
+    # Branchless logistic function, a single tanh instead of the exp and
+    # select of the numerically stable sigmoid
+    return 0.5 + 0.5 * keras.ops.tanh(0.5 * x)
+
+
+def _synaptic_currents(v_src, mu, sigma, w, w_erev, dst_idx, state_size):
+    """Reduces the synaptic activations over the incoming synapses of each neuron.
+
+    :param v_src: Presynaptic potentials of shape (synapses, batch)
+    :return: Tuple of the summed w * erev * activation and w * activation, each of shape (units, batch)
+    """
+    # Each synaptic activation is consumed directly by the two reductions,
+    # which lets XLA fuse gather, sigmoid, products and sums into one kernel
+    activation = _sigmoid(sigma * (v_src - mu))
+    # Synaptic parameters may be stored in reduced precision, but the
+    # reductions and the neuron state are always accumulated in float32
+    w_activation = keras.ops.cast(w * activation, "float32")
+    rev_activation = keras.ops.cast(w_erev * activation, "float32")
+
+    w_numerator = _segment_sum(rev_activation, dst_idx, num_segments=state_size)
+    w_denominator = _segment_sum(w_activation, dst_idx, num_segments=state_size)
+    return w_numerator, w_denominator
+
+
+@_jit_compile
+def _sensory_currents(
+        inputs, input_w, input_b, mu, sigma, w, erev, src_idx, dst_idx, state_size
+):
+    # Sensory inputs are constant over the ODE unfolds, hence their synaptic
+    # currents are computed once per RNN step. The input mapping (None if absent)
+    # is fused into the gather of the presynaptic inputs
+    if input_w is not None:
+        inputs = inputs * input_w
+    if input_b is not None:
+        inputs = inputs + input_b
+    v_src = keras.ops.cast(keras.ops.take(inputs, src_idx, axis=0), sigma.dtype)
+    return _synaptic_currents(v_src, mu, sigma, w, w * erev, dst_idx, state_size)
+
+
+@_jit_compile
+def _ode_unfold(
+        v_pre,
+        cm_t,
+        gleak,
+        vleak,
+        mu,
+        sigma,
+        w,
+        w_erev,
+        src_idx,
+        dst_idx,
+        w_numerator_sensory,
+        w_denominator_sensory,
+        output_w,
+        output_b,
+        state_size,
+        motor_size,
+        ode_unfolds,
+        epsilon,
+):
+    # The leak and sensory terms are loop invariant
+    numerator_invariant = gleak * vleak + w_numerator_sensory
+    denominator_invariant = cm_t + gleak + w_denominator_sensory + epsilon
+
+    def unfold_step(t, v_pre):
+        v_src = keras.ops.cast(keras.ops.take(v_pre, src_idx, axis=0), sigma.dtype)
+        w_numerator, w_denominator = _synaptic_currents(
+            v_src, mu, sigma, w, w_erev, dst_idx, state_size
+        )
+
+        numerator = cm_t * v_pre + numerator_invariant + w_numerator
+        # epsilon (part of the invariant term) avoids dividing by 0
+        return numerator * keras.ops.reciprocal(denominator_invariant + w_denominator)
+
+    # Where keras.ops.fori_loop is used (JAX, PyTorch), the loop op keeps the traced
+    # graph independent of the number of unfolds. TensorFlow unrolls the unfolds
+    # into straight-line code inside the XLA compiled function (see _fori_loop)
+    v_pre = _fori_loop(0, ode_unfolds, unfold_step, v_pre)
+
+    # The output mapping (None if absent) is applied to the motor neurons
+    # within the same compiled function
+    outputs = v_pre[0:motor_size]
+    if output_w is not None:
+        outputs = outputs * output_w
+    if output_b is not None:
+        outputs = outputs + output_b
+    return v_pre, outputs
+
+
 @keras.utils.register_keras_serializable(package="ncps", name="LTCCell")
 class LTCCell(keras.layers.Layer):
     name = "LTC-Cell"
@@ -28,6 +164,7 @@ class LTCCell(keras.layers.Layer):
             ode_unfolds=6,
             epsilon=1e-8,
             initialization_ranges=None,
+            synapse_dtype="float32",
             **kwargs
     ):
         """A `Liquid time-constant (LTC) <https://ojs.aaai.org/index.php/AAAI/article/view/16936>`_ cell.
@@ -58,6 +195,7 @@ class LTCCell(keras.layers.Layer):
         :param ode_unfolds:
         :param epsilon:
         :param initialization_ranges:
+        :param synapse_dtype:
         :param kwargs:
         """
 
@@ -100,6 +238,7 @@ class LTCCell(keras.layers.Layer):
         self._output_mapping = output_mapping
         self._ode_unfolds = ode_unfolds
         self._epsilon = epsilon
+        self._synapse_dtype = synapse_dtype
 
     @property
     def state_size(self):
@@ -124,16 +263,33 @@ class LTCCell(keras.layers.Layer):
         else:
             return keras.initializers.RandomUniform(minval, maxval)
 
+    def _build_wiring(self, input_dim):
+        self.wiring.build(input_dim)
+
+    def _synapse_edges(self, adjacency_matrix, erev, sensory=False):
+        """Returns the synapses of an adjacency matrix of the wiring as edge list.
+
+        :param adjacency_matrix: Adjacency matrix of the wiring
+        :param erev: Initial reversal potentials of shape of the adjacency matrix
+        :param sensory: Whether the adjacency matrix is the one of the sensory synapses
+        :return: Tuple (src_idx, dst_idx, erev) of the synapses sorted by their postsynaptic neuron
+        """
+        src_idx, dst_idx = _synapses(adjacency_matrix)
+        return src_idx, dst_idx, erev[src_idx, dst_idx]
+
     def build(self, input_shape):
 
         # Check if input_shape is nested tuple/list
         if isinstance(input_shape[0], tuple) or isinstance(input_shape[0], keras.KerasTensor):
             # Nested tuple -> First item represent feature dimension
             input_dim = input_shape[0][-1]
+            # The sampling mode is fixed by the structure of the inputs
+            self._irregular = True
         else:
             input_dim = input_shape[-1]
+            self._irregular = False
 
-        self.wiring.build(input_dim)
+        self._build_wiring(input_dim)
 
         self._params = {}
         self._params["gleak"] = self.add_weight(
@@ -156,63 +312,78 @@ class LTCCell(keras.layers.Layer):
             constraint=keras.constraints.NonNeg(),
             initializer=self._get_initializer("cm"),
         )
+        # Synaptic parameters are only stored for the synapses that exist in the
+        # wiring, i.e., for the non-zero entries of the adjacency matrices
+        src_idx, dst_idx, erev = self._synapse_edges(
+            self.wiring.adjacency_matrix, self.wiring.erev_initializer()
+        )
+        sensory_src_idx, sensory_dst_idx, sensory_erev = self._synapse_edges(
+            self.wiring.sensory_adjacency_matrix,
+            self.wiring.sensory_erev_initializer(),
+            sensory=True,
+        )
+        synapse_count = len(src_idx)
+        sensory_synapse_count = len(sensory_src_idx)
+
         self._params["sigma"] = self.add_weight(
             name="sigma",
-            shape=(self.state_size, self.state_size),
-            dtype="float32",
+            shape=(synapse_count,),
+            dtype=self._synapse_dtype,
             initializer=self._get_initializer("sigma"),
         )
         self._params["mu"] = self.add_weight(
             name="mu",
-            shape=(self.state_size, self.state_size),
-            dtype="float32",
+            shape=(synapse_count,),
+            dtype=self._synapse_dtype,
             initializer=self._get_initializer("mu"),
         )
         self._params["w"] = self.add_weight(
             name="w",
-            shape=(self.state_size, self.state_size),
-            dtype="float32",
+            shape=(synapse_count,),
+            dtype=self._synapse_dtype,
             constraint=keras.constraints.NonNeg(),
             initializer=self._get_initializer("w"),
         )
         self._params["erev"] = self.add_weight(
             name="erev",
-            shape=(self.state_size, self.state_size),
-            dtype="float32",
-            initializer=self.wiring.erev_initializer,
+            shape=(synapse_count,),
+            dtype=self._synapse_dtype,
+            initializer=lambda shape, dtype=None: erev,
         )
 
         self._params["sensory_sigma"] = self.add_weight(
             name="sensory_sigma",
-            shape=(self.sensory_size, self.state_size),
-            dtype="float32",
+            shape=(sensory_synapse_count,),
+            dtype=self._synapse_dtype,
             initializer=self._get_initializer("sensory_sigma"),
         )
         self._params["sensory_mu"] = self.add_weight(
             name="sensory_mu",
-            shape=(self.sensory_size, self.state_size),
-            dtype="float32",
+            shape=(sensory_synapse_count,),
+            dtype=self._synapse_dtype,
             initializer=self._get_initializer("sensory_mu"),
         )
         self._params["sensory_w"] = self.add_weight(
             name="sensory_w",
-            shape=(self.sensory_size, self.state_size),
-            dtype="float32",
+            shape=(sensory_synapse_count,),
+            dtype=self._synapse_dtype,
             constraint=keras.constraints.NonNeg(),
             initializer=self._get_initializer("sensory_w"),
         )
         self._params["sensory_erev"] = self.add_weight(
             name="sensory_erev",
-            shape=(self.sensory_size, self.state_size),
-            dtype="float32",
-            initializer=self.wiring.sensory_erev_initializer,
+            shape=(sensory_synapse_count,),
+            dtype=self._synapse_dtype,
+            initializer=lambda shape, dtype=None: sensory_erev,
         )
 
-        self._params["sparsity_mask"] = keras.ops.convert_to_tensor(
-            np.abs(self.wiring.adjacency_matrix), dtype="float32"
+        self._params["src_idx"] = keras.ops.convert_to_tensor(src_idx, dtype="int32")
+        self._params["dst_idx"] = keras.ops.convert_to_tensor(dst_idx, dtype="int32")
+        self._params["sensory_src_idx"] = keras.ops.convert_to_tensor(
+            sensory_src_idx, dtype="int32"
         )
-        self._params["sensory_sparsity_mask"] = keras.ops.convert_to_tensor(
-            np.abs(self.wiring.sensory_adjacency_matrix), dtype="float32"
+        self._params["sensory_dst_idx"] = keras.ops.convert_to_tensor(
+            sensory_dst_idx, dtype="int32"
         )
 
         if self._input_mapping in ["affine", "linear"]:
@@ -246,90 +417,153 @@ class LTCCell(keras.layers.Layer):
             )
         self.built = True
 
-    def _sigmoid(self, v_pre, mu, sigma):
-        v_pre = keras.ops.expand_dims(v_pre, axis=-1)  # For broadcasting
-        mues = v_pre - mu
-        x = sigma * mues
-        return keras.activations.sigmoid(x)
-
-    def _ode_solver(self, inputs, state, elapsed_time):
-        v_pre = state
+    def _solver_params(self, elapsed_time):
+        """Returns the parameters of the ODE solver in its neuron-major layout.
 
-        # We can pre-compute the effects of the sensory neurons here
-        sensory_w_activation = self._params["sensory_w"] * self._sigmoid(
-            inputs, self._params["sensory_mu"], self._params["sensory_sigma"]
+        None of them depend on the inputs or the neuron state, hence they can be
+        shared by consecutive RNN steps.
+        """
+        params = {
+            k: keras.ops.expand_dims(self._params[k], axis=-1)
+            for k in [
+                "gleak",
+                "vleak",
+                "mu",
+                "sigma",
+                "w",
+                "sensory_mu",
+                "sensory_sigma",
+                "sensory_w",
+                "sensory_erev",
+            ]
+        }
+        params["w_erev"] = params["w"] * keras.ops.expand_dims(
+            self._params["erev"], axis=-1
         )
-        sensory_w_activation *= self._params["sensory_sparsity_mask"]
+        for k in ["input_w", "input_b", "output_w", "output_b"]:
+            params[k] = (
+                keras.ops.expand_dims(self._params[k], axis=-1)
+                if k in self._params
+                else None
+            )
 
-        sensory_rev_activation = sensory_w_activation * self._params["sensory_erev"]
+        # cm/t is loop invariant
+        cm = keras.ops.expand_dims(self._params["cm"], axis=-1)
+        if isinstance(elapsed_time, float):
+            # Regularly sampled mode, the time-step is a Python constant
+            params["cm_t"] = cm * (self._ode_unfolds / elapsed_time)
+        else:
+            # Irregularly sampled mode, one time-step per sample, i.e., (1, batch)
+            elapsed_time = keras.ops.cast(
+                keras.ops.reshape(elapsed_time, (1, -1)), dtype="float32"
+            )
+            # A reciprocal per sample, instead of a divide per neuron and sample
+            inv_dt = self._ode_unfolds / elapsed_time
+            params["cm_t"] = cm * inv_dt
+        return params
 
-        # Reduce over dimension 1 (=source sensory neurons)
-        w_numerator_sensory = keras.ops.sum(sensory_rev_activation, axis=1)
-        w_denominator_sensory = keras.ops.sum(sensory_w_activation, axis=1)
+    def _solve(self, inputs, v_pre, params):
+        # Inputs, state and outputs are neuron-major, i.e., of shape (features, batch),
+        # (units, batch) and (motor neurons, batch), such that presynaptic potentials
+        # can be gathered and postsynaptic currents be reduced along axis 0
 
-        # cm/t is loop invariant
-        cm_t = self._params["cm"] / keras.ops.cast(
-            elapsed_time / self._ode_unfolds, dtype="float32"
+        # We can pre-compute the effects of the sensory neurons here
+        w_numerator_sensory, w_denominator_sensory = _sensory_currents(
+            inputs,
+            params["input_w"],
+            params["input_b"],
+            params["sensory_mu"],
+            params["sensory_sigma"],
+            params["sensory_w"],
+            params["sensory_erev"],
+            self._params["sensory_src_idx"],
+            self._params["sensory_dst_idx"],
+            self.state_size,
         )
 
         # Unfold the multiply ODE multiple times into one RNN step
-        for t in range(self._ode_unfolds):
-            w_activation = self._params["w"] * self._sigmoid(
-                v_pre, self._params["mu"], self._params["sigma"]
-            )
-
-            w_activation *= self._params["sparsity_mask"]
-
-            rev_activation = w_activation * self._params["erev"]
+        return _ode_unfold(
+            v_pre,
+            params["cm_t"],
+            params["gleak"],
+            params["vleak"],
+            params["mu"],
+            params["sigma"],
+            params["w"],
+            params["w_erev"],
+            self._params["src_idx"],
+            self._params["dst_idx"],
+            w_numerator_sensory,
+            w_denominator_sensory,
+            params["output_w"],
+            params["output_b"],
+            self.state_size,
+            self.motor_size,
+            self._ode_unfolds,
+            self._epsilon,
+        )
 
-            # Reduce over dimension 1 (=source neurons)
-            w_numerator = keras.ops.sum(rev_activation, axis=1) + w_numerator_sensory
-            w_denominator = keras.ops.sum(w_activation, axis=1) + w_denominator_sensory
+    def _ode_solver(self, inputs, state, elapsed_time):
+        inputs = keras.ops.transpose(inputs)
+        # A state without batch dimension is shared by all samples of the batch
+        v_pre = keras.ops.broadcast_to(
+            keras.ops.transpose(keras.ops.reshape(state, (-1, self.state_size))),
+            (self.state_size, keras.ops.shape(inputs)[-1]),
+        )
+        v_pre, outputs = self._solve(inputs, v_pre, self._solver_params(elapsed_time))
+        return keras.ops.transpose(outputs), keras.ops.transpose(v_pre)
 
-            numerator = (
-                    cm_t * v_pre
-                    + self._params["gleak"] * self._params["vleak"]
-                    + w_numerator
+    def call(self, sequence, states, training=False):
+        irregular = isinstance(sequence, (tuple, list))
+        if irregular != self._irregular:
+            modes = ["regularly sampled", "irregularly sampled (inputs, elapsed_time)"]
+            raise ValueError(
+                "LTCCell was built for {} inputs, but is called with {} inputs".format(
+                    modes[self._irregular], modes[irregular]
+                )
             )
-            denominator = cm_t + self._params["gleak"] + w_denominator
+        if self._irregular:
+            return self._call_irregular(sequence, states, training)
+        return self._call_regular(sequence, states, training)
 
-            # Avoid dividing by 0
-            v_pre = numerator / (denominator + self._epsilon)
+    def _call_regular(self, sequence, states, training=False):
+        # Regularly sampled mode (elapsed time = 1 second)
+        outputs, next_state = self._ode_solver(sequence, states[0], 1.0)
 
-        return v_pre
-
-    def _map_inputs(self, inputs):
-        if self._input_mapping in ["affine", "linear"]:
-            inputs = inputs * self._params["input_w"]
-        if self._input_mapping == "affine":
-            inputs = inputs + self._params["input_b"]
-        return inputs
-
-    def _map_outputs(self, state):
-        output = state
-        if self.motor_size < self.state_size:
-            output = output[:, 0: self.motor_size]
+        return outputs, [next_state]
 
-        if self._output_mapping in ["affine", "linear"]:
-            output = output * self._params["output_w"]
-        if self._output_mapping == "affine":
-            output = output + self._params["output_b"]
-        return output
+    def _call_irregular(self, sequence, states, training=False):
+        # Irregularly sampled mode
+        inputs, elapsed_time = sequence
+        outputs, next_state = self._ode_solver(inputs, states[0], elapsed_time)
 
-    def call(self, sequence, states, training=False):
-        if isinstance(sequence, (tuple, list)):
-            # Irregularly sampled mode
-            inputs, elapsed_time = sequence
-        else:
-            # Regularly sampled mode (elapsed time = 1 second)
-            elapsed_time = 1.0
-        inputs = self._map_inputs(sequence)
+        return outputs, [next_state]
 
-        next_state = self._ode_solver(inputs, states[0], elapsed_time)
+    def call_sequence(self, sequence, initial_state):
+        """Processes a whole regularly sampled sequence with a single scan over time.
 
-        outputs = self._map_outputs(next_state)
+        The parameters of the ODE solver are prepared only once instead of for every time-step.
 
-        return outputs, [next_state]
+        :param sequence: Input sequence of shape (batch, time, features)
+        :param initial_state: Initial neuron state of shape (batch, units)
+        :return: Tuple (outputs, final_state) of shapes (batch, time, motor neurons) and (batch, units)
+        """
+        params = self._solver_params(1.0)
+        # (batch, time, features) -> (time, features, batch)
+        inputs = keras.ops.transpose(sequence, (1, 2, 0))
+
+        def step(carry, inputs):
+            v_pre, _ = carry
+            v_pre, outputs = self._solve(inputs, v_pre, params)
+            # keras.ops.scan requires the stacked values to match the carry
+            return (v_pre, outputs), (v_pre, outputs)
+
+        v_pre = keras.ops.transpose(initial_state)
+        (final_state, _), (_, outputs) = keras.ops.scan(
+            step, (v_pre, v_pre[0: self.motor_size]), inputs
+        )
+        # (time, motor neurons, batch) -> (batch, time, motor neurons)
+        return keras.ops.transpose(outputs, (2, 0, 1)), keras.ops.transpose(final_state)
 
     def get_config(self):
         config = super(LTCCell, self).get_config()
@@ -338,6 +572,7 @@ class LTCCell(keras.layers.Layer):
         config["output_mapping"] = self._output_mapping
         config["ode_unfolds"] = self._ode_unfolds
         config["epsilon"] = self._epsilon
+        config["synapse_dtype"] = self._synapse_dtype
         return config
 
     @classmethod
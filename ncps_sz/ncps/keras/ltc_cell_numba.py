@@ -0,0 +1,196 @@
+# Copyright 2022 Mathias Lechner and Ramin Hasani
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import keras
+import numpy as np
+
+from .ltc_cell import LTCCell
+
+
+@keras.utils.register_keras_serializable(package="ncps", name="LTCCellNumba")
+class LTCCellNumba(LTCCell):
+    name = "LTC-Cell-Numba"
+
+    # Parameters passed on to the Numba kernel (in this order)
+    _kernel_params = [
+        "gleak",
+        "vleak",
+        "mu",
+        "sigma",
+        "w",
+        "erev",
+        "src_idx",
+        "sensory_mu",
+        "sensory_sigma",
+        "sensory_w",
+        "sensory_erev",
+        "sensory_src_idx",
+    ]
+
+    def __init__(self, wiring, **kwargs):
+        """A `Liquid time-constant (LTC) <https://ojs.aaai.org/index.php/AAAI/article/view/16936>`_ cell
+        whose ODE solver runs as a compiled `Numba <https://numba.pydata.org>`_ CPU kernel.
+
+        For small wirings, the per-op dispatch overhead of the deep learning framework dominates
+        the actual computation of an RNN step. This cell is meant for inference on the CPU in such
+        cases, e.g., on embedded devices. It has the same weights as `ncps.keras.LTCCell`, but
+        gradients are not propagated through the ODE solver, i.e., train with `ncps.keras.LTCCell`
+        and transfer the weights.
+
+        . Note::
+            The cell is opt-in only. `ncps.keras.LTCCell` and `ncps.keras.LTC` never switch to the
+            Numba kernel on their own, as this would silently stop the gradients during training.
+
+        Examples::
+
+             >>> import ncps
+             >>> from ncps.keras import LTCCell, LTCCellNumba
+             >>>
+             >>> wiring = ncps.wirings.Random(16, output_dim=2, sparsity_level=0.5)
+             >>> rnn = keras.layers.RNN(LTCCell(wiring))
+             >>> x_seq = keras.random.uniform((1,20,4)) # (batch, time, features)
+             >>> y_seq = rnn(x_seq)
+             >>> fast_rnn = keras.layers.RNN(LTCCellNumba(wiring))
+             >>> fast_rnn.build(x_seq.shape)
+             >>> fast_rnn.set_weights(rnn.get_weights())
+             >>> y_seq = fast_rnn(x_seq)
+
+        :param wiring:
+        :param kwargs: See `ncps.keras.LTCCell`
+        """
+        try:
+            from . import _ltc_numba
+        except ImportError:
+            raise ImportError(
+                "It seems like the Numba package is not installed\n"
+                "Please run"
+                "`$ pip install numba`. \n",
+            )
+        super().__init__(wiring, **kwargs)
+        self._kernel = _ltc_numba.ode_solver
+
+    def build(self, input_shape):
+        super().build(input_shape)
+        # The synapses are sorted by their postsynaptic neuron, hence the
+        # kernel addresses them in compressed sparse row form
+        self._indptr = np.searchsorted(
+            keras.ops.convert_to_numpy(self._params["dst_idx"]),
+            np.arange(self.state_size + 1),
+        ).astype(np.int32)
+        self._sensory_indptr = np.searchsorted(
+            keras.ops.convert_to_numpy(self._params["sensory_dst_idx"]),
+            np.arange(self.state_size + 1),
+        ).astype(np.int32)
+
+    def _numpy_ode_solver(
+            self, inputs, state, elapsed_time, cm, input_w, input_b, output_w, output_b, *params
+    ):
+        (
+            gleak,
+            vleak,
+            mu,
+            sigma,
+            w,
+            erev,
+            src_idx,
+            sensory_mu,
+            sensory_sigma,
+            sensory_w,
+            sensory_erev,
+            sensory_src_idx,
+        ) = [
+            np.ascontiguousarray(p, dtype=np.int32 if p.dtype.kind == "i" else np.float32)
+            for p in params
+        ]
+        v_pre = np.broadcast_to(state, (inputs.shape[0], self.state_size))
+        # One time-step per sample (or a single one), i.e., (batch, 1) as in LTCCell
+        elapsed_time = np.reshape(elapsed_time, (-1, 1))
+        cm_t = np.broadcast_to(cm * (self._ode_unfolds / elapsed_time), v_pre.shape)
+        v_pre = self._kernel(
+            np.array(v_pre, dtype=np.float32),
+            np.ascontiguousarray(inputs * input_w + input_b, dtype=np.float32),
+            np.array(cm_t, dtype=np.float32),
+            gleak,
+            vleak,
+            mu,
+            sigma,
+            w,
+            erev,
+            src_idx,
+            self._indptr,
+            sensory_mu,
+            sensory_sigma,
+            sensory_w,
+            sensory_erev,
+            sensory_src_idx,
+            self._sensory_indptr,
+            self._ode_unfolds,
+            self._epsilon,
+        )
+        outputs = v_pre[:, 0: self.motor_size] * output_w + output_b
+        return outputs.astype(np.float32), v_pre
+
+    def _ode_solver(self, inputs, state, elapsed_time):
+        args = [
+            inputs,
+            keras.ops.reshape(state, (-1, self.state_size)),
+            keras.ops.convert_to_tensor(elapsed_time, dtype="float32"),
+            self._params["cm"],
+            # Absent input and output mappings are the identity
+            self._params.get("input_w", np.ones(self.sensory_size, np.float32)),
+            self._params.get("input_b", np.zeros(self.sensory_size, np.float32)),
+            self._params.get("output_w", np.ones(self.motor_size, np.float32)),
+            self._params.get("output_b", np.zeros(self.motor_size, np.float32)),
+        ] + [self._params[k] for k in self._kernel_params]
+        output_shapes = (
+            (inputs.shape[0], self.motor_size),
+            (inputs.shape[0], self.state_size),
+        )
+
+        backend = keras.backend.backend()
+        if backend == "tensorflow":
+            import tensorflow as tf
+
+            results = tf.numpy_function(
+                self._numpy_ode_solver, args, [tf.float32, tf.float32], stateful=False
+            )
+            return tuple(tf.ensure_shape(r, s) for r, s in zip(results, output_shapes))
+        if backend == "jax":
+            import jax
+
+            return jax.pure_callback(
+                self._numpy_ode_solver,
+                tuple(jax.ShapeDtypeStruct(s, "float32") for s in output_shapes),
+                *[keras.ops.convert_to_tensor(a) for a in args],
+            )
+        results = self._numpy_ode_solver(*[keras.ops.convert_to_numpy(a) for a in args])
+        return tuple(keras.ops.convert_to_tensor(r) for r in results)
+
+    def call_sequence(self, sequence, initial_state):
+        # The compiled solver of LTCCell.call_sequence would bypass the Numba
+        # kernel, hence the sequence is solved step by step with the kernel
+        def step(carry, inputs):
+            state, _ = carry
+            outputs, state = self._ode_solver(inputs, state, 1.0)
+            return (state, outputs), (state, outputs)
+
+        initial_outputs = keras.ops.zeros(
+            (keras.ops.shape(initial_state)[0], self.motor_size)
+        )
+        (final_state, _), (_, outputs) = keras.ops.scan(
+            step,
+            (initial_state, initial_outputs),
+            keras.ops.transpose(sequence, (1, 0, 2)),
+        )
+        return keras.ops.transpose(outputs, (1, 0, 2)), final_state
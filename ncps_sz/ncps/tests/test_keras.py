@@ -22,7 +22,7 @@ import keras
 import numpy as np
 import pytest
 import ncps
-from ncps.keras import CfC, LTCCell, LTC
+from ncps.keras import CfC, LTCCell, LTCCellNumba, BatchedLTCCell, LTC
 from ncps import wirings
 
 
@@ -245,6 +245,193 @@ def test_ncps():
     assert hx[0].shape == (3, wiring.units)
 
 
+def test_ltc_synapse_params():
+    wiring = ncps.wirings.Random(16, 2, sparsity_level=0.5)
+    ltc_cell = LTCCell(wiring)
+    ltc_cell.build((None, 4))
+    # Synaptic parameters exist only for the synapses of the wiring
+    for name in ["w", "mu", "sigma", "erev"]:
+        assert ltc_cell._params[name].shape == (wiring.synapse_count,)
+        assert ltc_cell._params["sensory_" + name].shape == (wiring.sensory_synapse_count,)
+    src_idx = keras.ops.convert_to_numpy(ltc_cell._params["src_idx"])
+    dst_idx = keras.ops.convert_to_numpy(ltc_cell._params["dst_idx"])
+    erev = keras.ops.convert_to_numpy(ltc_cell._params["erev"])
+    assert np.array_equal(erev, wiring.adjacency_matrix[src_idx, dst_idx])
+
+
+def test_ltc_bfloat16_synapses():
+    wiring = ncps.wirings.Random(16, 2, sparsity_level=0.5)
+    rnn = LTC(wiring, synapse_dtype="bfloat16")
+    data = keras.random.normal([5, 3, 4])
+    output = rnn(data)
+    assert rnn.cell._params["w"].dtype == "bfloat16"
+    assert rnn.cell._params["cm"].dtype == "float32"
+    assert output.dtype == "float32"
+    assert output.shape == (5, 2)
+
+
+def test_ltc_numba():
+    pytest.importorskip("numba")
+    data_x, data_y = prepare_test_data()
+    ltc = keras.layers.RNN(LTCCell(wirings.Random(16, 1, sparsity_level=0.5)), return_sequences=True)
+    expected = keras.ops.convert_to_numpy(ltc(data_x))
+
+    ltc_numba = keras.layers.RNN(LTCCellNumba(wirings.Random(16, 1, sparsity_level=0.5)), return_sequences=True)
+    ltc_numba.build(data_x.shape)
+    ltc_numba.set_weights(ltc.get_weights())
+    model = keras.models.Sequential([keras.layers.InputLayer(input_shape=(None, 2)), ltc_numba])
+    output = model.predict(data_x)
+    assert output.shape == data_y.shape
+    assert np.allclose(output, expected, atol=1e-5)
+
+    # Whole sequences must be solved by the Numba kernel as well
+    cell = ltc_numba.cell
+    calls = []
+    kernel = cell._kernel
+    cell._kernel = lambda *args: calls.append(1) or kernel(*args)
+    output, _ = cell.call_sequence(data_x, keras.ops.zeros((data_x.shape[0], cell.state_size)))
+    assert len(calls) == data_x.shape[1]
+    assert np.allclose(keras.ops.convert_to_numpy(output), expected, atol=1e-5)
+
+
+def test_ltc_numba_irregular():
+    pytest.importorskip("numba")
+    ltc_cell = LTCCell(ncps.wirings.FullyConnected(8, 4))
+    ltc_numba = LTCCellNumba(ncps.wirings.FullyConnected(8, 4))
+    # A batch size equal to the number of units must not mix up samples and neurons
+    for batch_size in [3, 8]:
+        data = keras.random.normal([batch_size, 8])
+        hx = keras.ops.zeros([batch_size, 8])
+        elapsed_time = np.linspace(0.5, 2.0, batch_size).astype("float32")
+        for dt in [elapsed_time.reshape(-1, 1), elapsed_time]:
+            expected, expected_hx = ltc_cell((data, dt), [hx])
+            if not ltc_numba.built:
+                ltc_numba((data, dt), [hx])
+                ltc_numba.set_weights(ltc_cell.get_weights())
+            output, output_hx = ltc_numba((data, dt), [hx])
+            assert np.allclose(output, expected, atol=1e-5)
+            assert np.allclose(output_hx[0], expected_hx[0], atol=1e-5)
+
+
+def test_ltc_irregular():
+    wiring = ncps.wirings.FullyConnected(8, 4)
+    ltc_cell = LTCCell(wiring)
+    data = keras.random.normal([3, 8])
+    hx = keras.ops.zeros([3, wiring.units])
+    output, hx = ltc_cell((data, keras.ops.ones([3, 1])), [hx])
+    assert output.shape == (3, 4)
+    assert hx[0].shape == (3, wiring.units)
+
+    regular_cell = LTCCell(ncps.wirings.FullyConnected(8, 4))
+    regular_cell.build(data.shape)
+    regular_cell.set_weights(ltc_cell.get_weights())
+    expected, _ = regular_cell(data, [keras.ops.zeros([3, wiring.units])])
+    assert np.allclose(output, expected, atol=1e-5)
+
+    # The sampling mode is fixed when the cell is built
+    with pytest.raises(ValueError):
+        regular_cell((data, keras.ops.ones([3, 1])), [keras.ops.zeros([3, wiring.units])])
+
+
+def test_ltc_call_sequence():
+    data_x, data_y = prepare_test_data()
+    rnn = keras.layers.RNN(LTCCell(wirings.Random(16, 1, sparsity_level=0.5)), return_sequences=True)
+    expected = keras.ops.convert_to_numpy(rnn(data_x))
+
+    ltc = LTC(wirings.Random(16, 1, sparsity_level=0.5), return_sequences=True)
+    ltc.build(data_x.shape)
+    ltc.set_weights(rnn.get_weights())
+    output = keras.ops.convert_to_numpy(ltc(data_x))
+    assert output.shape == data_y.shape
+    assert np.allclose(output, expected, atol=1e-5)
+
+    model = keras.models.Sequential([keras.layers.InputLayer(input_shape=(None, 2)), ltc])
+    model.compile(optimizer=keras.optimizers.Adam(0.01), loss="mean_squared_error")
+    model.fit(x=data_x, y=data_y, batch_size=1, epochs=3)
+
+
+def test_batched_ltc():
+    wiring = ncps.wirings.Random(16, 2, sparsity_level=0.5)
+    rnn = keras.layers.RNN(BatchedLTCCell(wiring, num_cells=3), return_sequences=True)
+    data = keras.random.normal([5, 4, 3 * 2])
+    output = keras.ops.convert_to_numpy(rnn(data))
+    assert output.shape == (5, 4, 3 * 2)
+
+    # Changing the inputs of the second cell must not affect the other cells
+    data = keras.ops.convert_to_numpy(data).copy()
+    data[..., 2:4] += 1.0
+    changed = keras.ops.convert_to_numpy(rnn(data))
+    assert np.allclose(output[..., 0:2], changed[..., 0:2])
+    assert np.allclose(output[..., 4:6], changed[..., 4:6])
+    assert not np.allclose(output[..., 2:4], changed[..., 2:4])
+
+    assert rnn.cell.get_config()["num_cells"] == 3
+
+
+def test_batched_ltc_equivalence():
+    num_cells, input_dim, output_dim = 2, 3, 2
+    batched_cell = BatchedLTCCell(
+        wirings.Random(8, output_dim, sparsity_level=0.5, random_seed=7), num_cells=num_cells
+    )
+    batched_cell.build((None, num_cells * input_dim))
+    # Motor neurons of all cells first, then the remaining neurons of each cell
+    assert list(batched_cell.state_indices(0)) == [0, 1] + list(range(4, 10))
+    assert list(batched_cell.state_indices(1)) == [2, 3] + list(range(10, 16))
+
+    rng = np.random.default_rng(0)
+    for v in batched_cell.weights:
+        v.assign(v * rng.uniform(0.5, 1.5, v.shape).astype("float32"))
+    params = {k: keras.ops.convert_to_numpy(v) for k, v in batched_cell._params.items()}
+    edges = {
+        prefix: {
+            (src, dst): i
+            for i, (src, dst) in enumerate(zip(params[prefix + "src_idx"], params[prefix + "dst_idx"]))
+        }
+        for prefix in ["", "sensory_"]
+    }
+
+    data = rng.normal(size=(5, num_cells * input_dim)).astype("float32")
+    state = rng.normal(scale=0.1, size=(5, batched_cell.state_size)).astype("float32")
+    output, next_state = batched_cell(data, [state])
+    output = keras.ops.convert_to_numpy(output)
+    next_state = keras.ops.convert_to_numpy(next_state[0])
+
+    for k in range(num_cells):
+        # Copy the weights of the k-th cell into a standalone cell with the same wiring
+        cell = LTCCell(wirings.Random(8, output_dim, sparsity_level=0.5, random_seed=7))
+        cell.build((None, input_dim))
+        neurons = batched_cell.state_indices(k)
+        features = slice(k * input_dim, (k + 1) * input_dim)
+        outputs = slice(k * output_dim, (k + 1) * output_dim)
+        src_idx = {
+            "": lambda src: neurons[src],
+            "sensory_": lambda src: k * input_dim + src,
+        }
+        for name in ["gleak", "vleak", "cm"]:
+            cell._params[name].assign(params[name][neurons])
+        for name in ["input_w", "input_b"]:
+            cell._params[name].assign(params[name][features])
+        for name in ["output_w", "output_b"]:
+            cell._params[name].assign(params[name][outputs])
+        for prefix in ["", "sensory_"]:
+            index = [
+                edges[prefix][(src_idx[prefix](src), neurons[dst])]
+                for src, dst in zip(
+                    keras.ops.convert_to_numpy(cell._params[prefix + "src_idx"]),
+                    keras.ops.convert_to_numpy(cell._params[prefix + "dst_idx"]),
+                )
+            ]
+            # The reversal potentials must keep the polarities of the wiring
+            erev = keras.ops.convert_to_numpy(cell._params[prefix + "erev"])
+            assert np.array_equal(np.sign(params[prefix + "erev"][index]), np.sign(erev))
+            for name in ["sigma", "mu", "w", "erev"]:
+                cell._params[prefix + name].assign(params[prefix + name][index])
+
+        expected, expected_state = cell(data[:, features], [state[:, neurons]])
+        assert np.allclose(output[:, outputs], keras.ops.convert_to_numpy(expected), atol=1e-6)
+        assert np.allclose(next_state[:, neurons], keras.ops.convert_to_numpy(expected_state[0]), atol=1e-6)
+
+
 def test_ncp_sizes():
     wiring = ncps.wirings.NCP(10, 10, 8, 6, 6, 4, 6)
     rnn = LTC(wiring)
@@ -123,9 +123,9 @@ class Wiring:
         # There might be a cleaner solution but it will work
         wiring = Wiring(config["units"])
         if config["adjacency_matrix"] is not None:
-            wiring.adjacency_matrix = np.array(config["adjacency_matrix"])
+            wiring.adjacency_matrix = np.array(config["adjacency_matrix"], dtype=np.int32)
         if config["sensory_adjacency_matrix"] is not None:
-            wiring.sensory_adjacency_matrix = np.array(config["sensory_adjacency_matrix"])
+            wiring.sensory_adjacency_matrix = np.array(config["sensory_adjacency_matrix"], dtype=np.int32)
         wiring.input_dim = config["input_dim"]
         wiring.output_dim = config["output_dim"]
 